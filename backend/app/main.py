@@ -1,4 +1,7 @@
+import importlib.util
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 
@@ -9,15 +12,18 @@ app = FastAPI(
     title="Adaptive AI Agent System",
     description="Multi-agent AI system with real-time voice and adaptive learning",
     version="1.0.0",
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    # stdlib json is only used when orjson is not installed
+    default_response_class=ORJSONResponse if importlib.util.find_spec("orjson") else JSONResponse
 )
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=settings.CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=86400,
 )
 
 app.include_router(agents.router, prefix="/api/agents", tags=["agents"])
@@ -0,0 +1,116 @@
+"""
+Per-sample PCM kernels for the voice pipeline, JIT-compiled with Numba when available
+"""
+
+import numpy as np
+
+# Numba JIT for per-sample audio loops. The kernels stay serial: they run on
+# asyncio.to_thread() workers, where a parallel launch gains nothing on
+# clip-sized input and (with the TBB layer) keeps the interpreter from exiting
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def pcm16_to_f32(pcm: np.ndarray, channels: int) -> np.ndarray:
+        """Convert interleaved int16 PCM to mono float32 in [-1, 1)"""
+        frames = pcm.shape[0] // channels
+        out = np.empty(frames, dtype=np.float32)
+        scale = np.float32(1.0 / (32768.0 * channels))
+        for i in range(frames):
+            acc = np.float32(0.0)
+            for c in range(channels):
+                acc += pcm[i * channels + c]
+            out[i] = acc * scale
+        return out
+
+    @njit(cache=True, fastmath=True)
+    def pcm16_downmix(pcm: np.ndarray, channels: int) -> np.ndarray:
+        """Average interleaved int16 PCM channels into mono int16"""
+        frames = pcm.shape[0] // channels
+        out = np.empty(frames, dtype=np.int16)
+        for i in range(frames):
+            acc = np.int32(0)
+            for c in range(channels):
+                acc += pcm[i * channels + c]
+            out[i] = acc // channels
+        return out
+
+    @njit(cache=True, fastmath=True)
+    def rolling_rms(pcm: np.ndarray, win: int) -> np.ndarray:
+        """RMS energy of consecutive non-overlapping windows of int16 PCM"""
+        out = np.empty(pcm.shape[0] // win, dtype=np.float32)
+        for i in range(out.shape[0]):
+            acc = 0.0
+            for j in range(win):
+                v = np.float64(pcm[i * win + j])
+                acc += v * v
+            out[i] = np.sqrt(acc / win)
+        return out
+
+    @njit(cache=True, fastmath=True)
+    def f32_rms(samples: np.ndarray) -> float:
+        """RMS energy of float32 samples in one pass, without a squared temporary"""
+        if samples.shape[0] == 0:
+            return 0.0
+        acc = 0.0
+        for i in range(samples.shape[0]):
+            v = np.float64(samples[i])
+            acc += v * v
+        return np.sqrt(acc / samples.shape[0])
+
+    @njit(cache=True, fastmath=True)
+    def f32_to_pcm16(samples: np.ndarray) -> np.ndarray:
+        """Clip float32 samples to [-1, 1] and scale them to int16 PCM in one fused loop"""
+        out = np.empty(samples.shape[0], dtype=np.int16)
+        for i in range(samples.shape[0]):
+            v = min(max(samples[i], np.float32(-1.0)), np.float32(1.0))
+            out[i] = np.int16(v * np.float32(32767.0))
+        return out
+else:
+    def pcm16_to_f32(pcm: np.ndarray, channels: int) -> np.ndarray:
+        """Convert interleaved int16 PCM to mono float32 in [-1, 1)"""
+        if channels == 1:
+            # One fused int16 -> float32 scale pass, no intermediate copy
+            return np.multiply(pcm, np.float32(1.0 / 32768.0), dtype=np.float32)
+        frames = pcm[:pcm.shape[0] // channels * channels].reshape(-1, channels)
+        out = frames.mean(axis=1, dtype=np.float32)
+        out *= np.float32(1.0 / 32768.0)
+        return out
+
+    def pcm16_downmix(pcm: np.ndarray, channels: int) -> np.ndarray:
+        """Average interleaved int16 PCM channels into mono int16"""
+        frames = pcm[:pcm.shape[0] // channels * channels].reshape(-1, channels)
+        return (frames.sum(axis=1, dtype=np.int32) // channels).astype(np.int16)
+
+    def rolling_rms(pcm: np.ndarray, win: int) -> np.ndarray:
+        """RMS energy of consecutive non-overlapping windows of int16 PCM"""
+        frames = pcm[:pcm.shape[0] // win * win].reshape(-1, win).astype(np.float32)
+        return np.sqrt(np.mean(np.square(frames), axis=1))
+
+    def f32_rms(samples: np.ndarray) -> float:
+        """RMS energy of float32 samples"""
+        if samples.size == 0:
+            return 0.0
+        return float(np.sqrt(np.mean(np.square(samples, dtype=np.float32))))
+
+    def f32_to_pcm16(samples: np.ndarray) -> np.ndarray:
+        """Clip float32 samples to [-1, 1] and scale them to int16 PCM"""
+        out = np.clip(samples, -1.0, 1.0)
+        out *= 32767
+        return out.astype(np.int16)
+
+
+def warm_up():
+    """Compile (or load from the on-disk cache) the kernels before the first utterance"""
+    pcm = np.zeros(2, dtype=np.int16)
+    pcm16_to_f32(pcm, 1)
+    pcm16_downmix(pcm, 2)
+    rolling_rms(pcm, 1)
+    samples = np.zeros(2, dtype=np.float32)
+    f32_rms(samples)
+    f32_to_pcm16(samples)
@@ -4,11 +4,17 @@ Real-time voice conversations with AI assistance
 """
 
 import asyncio
+import io
 import logging
 import json
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass
 from typing import Optional, Dict, Any
 import numpy as np
 from datetime import datetime
+from functools import lru_cache
 
 # LiveKit imports
 try:
@@ -49,6 +55,42 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+
+SALES_SYSTEM_PROMPT = (
+    "You are a sales AI assistant. Your goal is to engage prospects, "
+    "understand their needs, and guide them through the sales process. "
+    "Be conversational, empathetic, and adaptive to their responses."
+)
+
+
+@lru_cache(maxsize=1)
+def _system_ctx():
+    """Build the system-prompt chat context once; sessions work on copies.
+
+    Keeping the prompt byte-identical across sessions lets prefix-caching
+    LLM servers reuse its KV cache.
+    """
+    return llm.ChatContext().append(role="system", text=SALES_SYSTEM_PROMPT)
+
+
+@lru_cache(maxsize=1)
+def _get_vad():
+    """Load the silero VAD once per process and share it across rooms"""
+    return silero.VAD.load()
+
+
+@dataclass(slots=True)
+class AudioTurnResult:
+    """Outcome of one audio turn; convert with dataclasses.asdict() for JSON"""
+    success: bool
+    transcription: Optional[str] = None
+    ai_response_text: Optional[str] = None
+    ai_response_audio: Optional[bytes] = None
+    processing_time: float = 0.0
+    error: Optional[str] = None
+    note: Optional[str] = None
+
+
 class LiveKitVoiceAssistant:
     """
     Advanced LiveKit Voice Assistant with AI integration
@@ -114,44 +156,44 @@ class LiveKitVoiceAssistant:
             logger.error(f"Failed to connect to room: {e}")
             return {"error": str(e)}
     
-    async def handle_audio_stream(self, audio_data: bytes) -> Dict[str, Any]:
+    async def handle_audio_stream(self, audio_data: bytes) -> AudioTurnResult:
         """Process incoming audio stream"""
+        started = time.perf_counter()
         try:
             if self.voice_agent:
                 # Use full voice agent if available
                 result = await self.voice_agent.process_audio_input(audio_data)
                 
                 if result.get('success'):
-                    return {
-                        "success": True,
-                        "transcription": result.get('transcription'),
-                        "ai_response_text": result.get('ai_response', {}).get('text'),
-                        "ai_response_audio": result.get('audio_response'),
-                        "processing_time": 0.5
-                    }
+                    return AudioTurnResult(
+                        success=True,
+                        transcription=result.get('transcription'),
+                        ai_response_text=result.get('ai_response', {}).get('text'),
+                        ai_response_audio=result.get('audio_response'),
+                        processing_time=time.perf_counter() - started
+                    )
                 else:
-                    return {"error": result.get('error', 'Processing failed')}
+                    return AudioTurnResult(success=False, error=result.get('error', 'Processing failed'))
             
             elif LOCAL_AI_AVAILABLE:
                 # Fallback: simulate transcription and use local AI
                 mock_transcription = "Hello, I need help with my business"
                 ai_result = await self.local_ai.route_and_process(mock_transcription)
                 
-                return {
-                    "success": True,
-                    "transcription": mock_transcription,
-                    "ai_response_text": ai_result.get('response', 'I can help you with that'),
-                    "ai_response_audio": None,
-                    "processing_time": 0.3,
-                    "note": "Simulated transcription - install speech libraries for real STT"
-                }
+                return AudioTurnResult(
+                    success=True,
+                    transcription=mock_transcription,
+                    ai_response_text=ai_result.get('response', 'I can help you with that'),
+                    processing_time=time.perf_counter() - started,
+                    note="Simulated transcription - install speech libraries for real STT"
+                )
             
             else:
-                return {"error": "No AI agent available"}
+                return AudioTurnResult(success=False, error="No AI agent available")
                 
         except Exception as e:
             logger.error(f"Audio stream processing error: {e}")
-            return {"error": str(e)}
+            return AudioTurnResult(success=False, error=str(e))
     
     def get_status(self) -> Dict[str, Any]:
         """Get current status of the voice assistant"""
@@ -202,18 +244,11 @@ class LiveKitVoiceAgent:
         await ctx.connect(auto_subscribe=AutoSubscribe.AUDIO_ONLY)
         
         assistant = VoiceAssistant(
-            vad=silero.VAD.load(),
+            vad=_get_vad(),
             stt=openai.STT(),
             llm=openai.LLM(model="gpt-4"),
             tts=openai.TTS(),
-            chat_ctx=llm.ChatContext().append(
-                role="system",
-                text=(
-                    "You are a sales AI assistant. Your goal is to engage prospects, "
-                    "understand their needs, and guide them through the sales process. "
-                    "Be conversational, empathetic, and adaptive to their responses."
-                ),
-            ),
+            chat_ctx=_system_ctx().copy(),
         )
         
         assistant.start(ctx.room)
@@ -243,30 +278,41 @@ class VoiceCallRecorder:
     async def start_recording(self, room_name: str):
         """Start recording a room"""
         logger.info(f"Starting recording for room: {room_name}")
+        # Segments are kept as (speaker, text) tuples, and the "speaker: text"
+        # transcript grows by one line per segment so reads never rebuild it
         self.recordings[room_name] = {
             "status": "recording",
-            "transcript": []
+            "segments": deque(),
+            "rendered": io.StringIO()
         }
     
     async def add_transcript_segment(self, room_name: str, segment: str, speaker: str):
         """Add transcript segment"""
-        if room_name in self.recordings:
-            self.recordings[room_name]["transcript"].append({
-                "speaker": speaker,
-                "text": segment
-            })
+        recording = self.recordings.get(room_name)
+        if recording is not None:
+            speaker = sys.intern(speaker)
+            rendered = recording["rendered"]
+            if recording["segments"]:
+                rendered.write("\n")
+            recording["segments"].append((speaker, segment))
+            rendered.write(f"{speaker}: {segment}")
     
     async def stop_recording(self, room_name: str) -> Dict[str, Any]:
         """Stop recording and return transcript"""
         if room_name in self.recordings:
             recording = self.recordings[room_name]
             recording["status"] = "completed"
-            return recording
+            return {
+                "status": recording["status"],
+                "transcript": [
+                    {"speaker": speaker, "text": text}
+                    for speaker, text in recording["segments"]
+                ]
+            }
         return {}
     
     def get_full_transcript(self, room_name: str) -> str:
         """Get full transcript as string"""
         if room_name in self.recordings:
-            segments = self.recordings[room_name]["transcript"]
-            return "\n".join([f"{s['speaker']}: {s['text']}" for s in segments])
+            return self.recordings[room_name]["rendered"].getvalue()
         return ""
@@ -1,16 +1,32 @@
 """
-Check if FFmpeg is installed and accessible
+Check the voice pipeline's audio dependencies (Python libraries and the optional FFmpeg fallback)
 """
+import functools
+import shutil
 import subprocess
 import sys
 
-def check_ffmpeg():
-    """Check if FFmpeg is installed and accessible"""
+@functools.lru_cache(maxsize=None)
+def check_ffmpeg(verbose: bool = False):
+    """Check if FFmpeg is installed and accessible (probed once per process)"""
     print("Checking FFmpeg installation...")
     print("-" * 50)
     
+    # A PATH lookup answers the question without spawning a process
+    if shutil.which('ffmpeg') is None:
+        print("❌ FFmpeg is NOT installed or not in PATH")
+        print("\nPlease install FFmpeg:")
+        print("   Option 1: choco install ffmpeg")
+        print("   Option 2: Download from https://ffmpeg.org/download.html")
+        print("\nSee AUDIO_SETUP.md for detailed instructions")
+        return False
+    
+    print("✅ FFmpeg is installed and accessible!")
+    if not verbose:
+        return True
+    
     try:
-        # Try to run ffmpeg -version
+        # Only run ffmpeg -version when asked for the version details
         result = subprocess.run(
             ['ffmpeg', '-version'],
             capture_output=True,
@@ -19,7 +35,6 @@ def check_ffmpeg():
         )
         
         if result.returncode == 0:
-            print("✅ FFmpeg is installed and accessible!")
             print("\nVersion info:")
             # Print first few lines of version output
             lines = result.stdout.split('\n')[:3]
@@ -31,14 +46,6 @@ def check_ffmpeg():
             print(f"Error: {result.stderr}")
             return False
             
-    except FileNotFoundError:
-        print("❌ FFmpeg is NOT installed or not in PATH")
-        print("\nPlease install FFmpeg:")
-        print("   Option 1: choco install ffmpeg")
-        print("   Option 2: Download from https://ffmpeg.org/download.html")
-        print("\nSee AUDIO_SETUP.md for detailed instructions")
-        return False
-        
     except Exception as e:
         print(f"❌ Error checking FFmpeg: {e}")
         return False
@@ -49,13 +56,17 @@ def check_audio_libraries():
     print("Checking Python audio libraries...")
     print("-" * 50)
     
+    # Uploads are decoded in-process by PyAV (libavcodec), so no ffmpeg
+    # subprocess is needed on the request path
     libraries = {
-        'pydub': 'Audio conversion',
-        'soundfile': 'Audio I/O',
-        'librosa': 'Audio processing',
+        'av': 'In-memory audio decoding/resampling',
         'speech_recognition': 'Speech-to-text',
         'pyttsx3': 'Text-to-speech'
     }
+    optional_libraries = {
+        'pydub': 'Audio conversion (ffmpeg-based, not used by the voice pipeline)',
+        'soundfile': 'Audio I/O'
+    }
     
     all_installed = True
     for lib, description in libraries.items():
@@ -66,25 +77,34 @@ def check_audio_libraries():
             print(f"❌ {lib:20s} - {description} (NOT INSTALLED)")
             all_installed = False
     
+    for lib, description in optional_libraries.items():
+        try:
+            __import__(lib)
+            print(f"✅ {lib:20s} - {description}")
+        except ImportError:
+            print(f"➖ {lib:20s} - {description} (optional, not installed)")
+    
     if not all_installed:
         print("\nInstall missing libraries:")
-        print("   pip install pydub soundfile librosa SpeechRecognition pyttsx3")
+        print("   pip install av SpeechRecognition pyttsx3")
     
     return all_installed
 
 if __name__ == "__main__":
     print("\n🔍 Audio Processing Setup Check\n")
     
-    ffmpeg_ok = check_ffmpeg()
+    ffmpeg_ok = check_ffmpeg(verbose='--verbose' in sys.argv)
     libs_ok = check_audio_libraries()
     
     print("\n" + "=" * 50)
     print("Summary:")
     print("-" * 50)
     
-    if ffmpeg_ok and libs_ok:
+    if libs_ok:
         print("✅ All audio processing dependencies are installed!")
         print("   You can now use voice features.")
+        if not ffmpeg_ok:
+            print("   (FFmpeg is only needed by openai-whisper when PyAV can't decode an upload.)")
         sys.exit(0)
     else:
         print("⚠️  Some dependencies are missing.")
@@ -1,4 +1,8 @@
+import importlib.util
+import os
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 # Import the API routers
@@ -14,15 +18,19 @@ app = FastAPI(
     title="Adaptive AI Agent System - Local AI",
     description="Multi-agent AI system with local intelligence (no API keys required)",
     version="1.0.0",
-    debug=True
+    debug=True,
+    # orjson serializes the agent/voice JSON envelopes much faster than stdlib json
+    default_response_class=ORJSONResponse if importlib.util.find_spec("orjson") else JSONResponse
 )
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    # Comma-separated CORS_ORIGINS overrides the local dev front-ends
+    allow_origins=os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:5173").split(","),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=86400,
 )
 
 # Include the agents router
@@ -32,6 +40,14 @@ app.include_router(agents.router, prefix="/api/agents", tags=["agents"])
 if VOICE_API_AVAILABLE:
     app.include_router(voice.router, prefix="/api/voice", tags=["voice"])
 
+@app.on_event("startup")
+async def warm_voice_models():
+    """Load the shared voice models before the first voice request"""
+    if VOICE_API_AVAILABLE:
+        import asyncio
+        from app.voice.voice_ai_agent import warmup_models
+        await asyncio.to_thread(warmup_models)
+
 @app.get("/")
 async def root():
     return {
@@ -55,5 +71,15 @@ async def health_check():
     }
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # uvicorn[standard] ships uvloop (no Windows build) and the httptools parser
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run(
+        app if workers == 1 else "simple_main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=workers
+    )
\ No newline at end of file
@@ -25,6 +25,12 @@ def test_imports():
     except ImportError as e:
         print(f"❌ pyttsx3 import failed: {e}")
     
+    try:
+        import faster_whisper
+        print("✅ faster-whisper imported successfully")
+    except ImportError as e:
+        print(f"❌ faster-whisper import failed: {e}")
+    
     try:
         import whisper
         print("✅ OpenAI Whisper imported successfully")
@@ -38,10 +44,10 @@ def test_imports():
         print(f"❌ SoundFile import failed: {e}")
     
     try:
-        import librosa
-        print("✅ Librosa imported successfully")
+        import av
+        print("✅ PyAV imported successfully")
     except ImportError as e:
-        print(f"❌ Librosa import failed: {e}")
+        print(f"❌ PyAV import failed: {e}")
     
     try:
         import torch
@@ -112,11 +118,12 @@ def test_whisper_model():
     print("\nTesting Whisper model...")
     
     try:
-        import whisper
-        
-        # Load the smallest model for testing
-        model = whisper.load_model("base")
-        print("✅ Whisper base model loaded successfully")
+        # Load through the agent's cached loader so the device and precision
+        # match production: fp16 on CUDA, int8 CTranslate2 on CPU
+        from app.voice.voice_ai_agent import _load_whisper, _stt_device
+        device = _stt_device()
+        backend, size, model = _load_whisper({"whisper_size": "base"}, device)
+        print(f"✅ Whisper {size} model loaded successfully ({backend} on {device})")
         
         return True
     except Exception as e:
@@ -0,0 +1,85 @@
+"""Parity tests for the voice PCM kernels: Numba builds must match the NumPy fallbacks"""
+import importlib.util
+import sys
+
+import numpy as np
+import pytest
+
+from app.voice import _audio_ops
+
+
+@pytest.fixture(scope="module")
+def fallback():
+    """A copy of _audio_ops loaded with Numba hidden, i.e. its NumPy implementations"""
+    saved = sys.modules.get("numba")
+    sys.modules["numba"] = None  # makes `from numba import ...` raise ImportError
+    try:
+        spec = importlib.util.spec_from_file_location("_audio_ops_numpy", _audio_ops.__file__)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        if saved is None:
+            del sys.modules["numba"]
+        else:
+            sys.modules["numba"] = saved
+    assert not module.NUMBA_AVAILABLE
+    return module
+
+
+_rng = np.random.default_rng(0)
+_PCM = [
+    np.zeros(0, dtype=np.int16),
+    np.array([32767, -32768, 0, 1, -1, 12345], dtype=np.int16),
+    _rng.integers(-32768, 32768, 4801, dtype=np.int16),
+]
+_SAMPLES = [
+    np.zeros(0, dtype=np.float32),
+    np.array([-1.5, -1.0, -0.5, 0.0, 0.5, 1.0, 1.5], dtype=np.float32),
+    _rng.uniform(-1.2, 1.2, 4800).astype(np.float32),
+]
+
+
+@pytest.mark.parametrize("pcm", _PCM)
+@pytest.mark.parametrize("channels", [1, 2])
+def test_pcm16_to_f32(fallback, pcm, channels):
+    expected = fallback.pcm16_to_f32(pcm, channels)
+    result = _audio_ops.pcm16_to_f32(pcm, channels)
+    assert result.dtype == expected.dtype == np.float32
+    np.testing.assert_allclose(result, expected, rtol=1e-6, atol=1e-7)
+
+
+@pytest.mark.parametrize("pcm", _PCM)
+@pytest.mark.parametrize("channels", [2, 3])
+def test_pcm16_downmix(fallback, pcm, channels):
+    expected = fallback.pcm16_downmix(pcm, channels)
+    result = _audio_ops.pcm16_downmix(pcm, channels)
+    assert result.dtype == expected.dtype == np.int16
+    np.testing.assert_array_equal(result, expected)
+
+
+@pytest.mark.parametrize("pcm", _PCM)
+@pytest.mark.parametrize("win", [1, 320])
+def test_rolling_rms(fallback, pcm, win):
+    expected = fallback.rolling_rms(pcm, win)
+    result = _audio_ops.rolling_rms(pcm, win)
+    assert result.shape == expected.shape == (pcm.shape[0] // win,)
+    np.testing.assert_allclose(result, expected, rtol=1e-5)
+
+
+@pytest.mark.parametrize("samples", _SAMPLES)
+def test_f32_rms(fallback, samples):
+    expected = fallback.f32_rms(samples)
+    assert _audio_ops.f32_rms(samples) == pytest.approx(expected, rel=1e-5)
+
+
+@pytest.mark.parametrize("samples", _SAMPLES)
+def test_f32_to_pcm16(fallback, samples):
+    expected = fallback.f32_to_pcm16(samples)
+    result = _audio_ops.f32_to_pcm16(samples)
+    assert result.dtype == expected.dtype == np.int16
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_f32_to_pcm16_clips_at_full_scale():
+    samples = np.array([-2.0, -1.0, 1.0, 2.0], dtype=np.float32)
+    np.testing.assert_array_equal(_audio_ops.f32_to_pcm16(samples), [-32767, -32767, 32767, 32767])
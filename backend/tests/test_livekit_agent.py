@@ -0,0 +1,29 @@
+"""Tests for the LiveKit voice helpers"""
+import asyncio
+
+from app.voice.livekit_agent import VoiceCallRecorder
+
+
+def test_recorder_transcript_tracks_every_append():
+    """The rendered transcript grows with each segment and matches the stored segments"""
+    recorder = VoiceCallRecorder()
+    transcripts = []
+
+    async def record():
+        await recorder.start_recording("room")
+        transcripts.append(recorder.get_full_transcript("room"))
+        for i in range(3):
+            await recorder.add_transcript_segment("room", f"line {i}", "agent" if i % 2 else "caller")
+            transcripts.append(recorder.get_full_transcript("room"))
+        return await recorder.stop_recording("room")
+
+    recording = asyncio.run(record())
+
+    assert transcripts == [
+        "",
+        "caller: line 0",
+        "caller: line 0\nagent: line 1",
+        "caller: line 0\nagent: line 1\ncaller: line 2",
+    ]
+    assert transcripts[-1] == "\n".join(f"{s['speaker']}: {s['text']}" for s in recording["transcript"])
+    assert recorder.get_full_transcript("missing") == ""
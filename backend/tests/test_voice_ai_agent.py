@@ -0,0 +1,314 @@
+"""Tests for the voice AI agent"""
+import asyncio
+import contextlib
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from app.voice import voice_ai_agent
+from app.voice.voice_ai_agent import VoiceAIAgent
+
+
+class _FakeTensor:
+    def __init__(self, items):
+        self.items = items
+
+    def to(self, device):
+        return self
+
+
+class _FakeWhisperModel:
+    is_multilingual = False
+    device = "cpu"
+    dims = types.SimpleNamespace(n_mels=80)
+
+    def __init__(self):
+        self.options = []
+
+    def decode(self, mel, options):
+        self.options.append(options)
+        return [types.SimpleNamespace(text=f" clip {i} ") for i in range(len(mel.items))]
+
+
+@pytest.fixture
+def fake_whisper(monkeypatch):
+    """Stand-ins for openai-whisper and torch, just enough for the batched decode"""
+    whisper = types.ModuleType("whisper")
+    whisper.pad_or_trim = lambda audio: audio
+    whisper.log_mel_spectrogram = lambda audio, n_mels: audio
+    whisper.DecodingOptions = lambda **kwargs: types.SimpleNamespace(**kwargs)
+    torch = types.ModuleType("torch")
+    torch.from_numpy = lambda array: array
+    torch.stack = lambda items: _FakeTensor(items)
+    torch.inference_mode = contextlib.nullcontext
+    monkeypatch.setitem(sys.modules, "whisper", whisper)
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    return _FakeWhisperModel()
+
+
+def _whisper_agent(model):
+    agent = VoiceAIAgent.__new__(VoiceAIAgent)
+    agent._whisper_backend = "openai"
+    agent.whisper_model = model
+    agent._whisper_max_tokens = 96
+    agent._whisper_options = {"fp16": False, "condition_on_previous_text": False, "sample_len": 96}
+    return agent
+
+
+def test_batched_whisper_pins_english_for_en_models(fake_whisper):
+    """Two clips decode in one pass, with language set so .en models don't reject the options"""
+    agent = _whisper_agent(fake_whisper)
+    clips = [np.zeros(16000, dtype=np.float32), np.zeros(8000, dtype=np.float32)]
+
+    assert agent._transcribe_batch(clips) == ["clip 0", "clip 1"]
+    assert len(fake_whisper.options) == 1
+    assert fake_whisper.options[0].language == "en"
+
+
+def test_aclose_stops_whisper_batcher(fake_whisper):
+    """Closing the agent cancels the batch dispatcher so it no longer holds the agent"""
+    async def scenario():
+        agent = _whisper_agent(fake_whisper)
+        agent._tts_cache = {}
+        agent._whisper_batcher = voice_ai_agent._WhisperBatcher(agent._transcribe_batch, 8, 10.0)
+        texts = await asyncio.gather(
+            agent._whisper_batcher.transcribe(np.zeros(16000, dtype=np.float32)),
+            agent._whisper_batcher.transcribe(np.zeros(16000, dtype=np.float32)),
+        )
+        dispatcher = agent._whisper_batcher._dispatcher
+        await agent.aclose()
+        return texts, dispatcher
+
+    texts, dispatcher = asyncio.run(scenario())
+    assert texts == ["clip 0", "clip 1"]
+    assert dispatcher.cancelled()
+
+
+def test_whisper_quantize_converts_whisper_linear_layers(monkeypatch):
+    """whisper's own Linear subclass is quantized, not skipped by the exact-type match"""
+    torch = pytest.importorskip("torch")
+
+    class WhisperLinear(torch.nn.Linear):
+        def forward(self, x):
+            return torch.nn.functional.linear(x, self.weight.to(x.dtype), self.bias)
+
+    class TinyWhisper(torch.nn.Module):
+        dims = types.SimpleNamespace(n_mels=80)
+
+        def __init__(self):
+            super().__init__()
+            self.encoder = torch.nn.Sequential(WhisperLinear(8, 8), torch.nn.GELU(), WhisperLinear(8, 4))
+
+        def transcribe(self, audio, **kwargs):
+            return {"text": ""}
+
+    whisper = types.ModuleType("whisper")
+    whisper.load_model = lambda name, device: TinyWhisper()
+    whisper.audio = types.SimpleNamespace(mel_filters=lambda device, n_mels: None)
+    monkeypatch.setitem(sys.modules, "whisper", whisper)
+
+    model = voice_ai_agent._get_whisper.__wrapped__("tiny.en", "cpu", True)
+
+    quantized = [m for m in model.modules() if isinstance(m, torch.ao.nn.quantized.dynamic.Linear)]
+    assert len(quantized) == 2
+    assert model.encoder(torch.zeros(1, 8)).shape == (1, 4)
+
+
+def test_tts_disk_cache_evicts_least_recently_used(tmp_path):
+    """The on-disk TTS cache stays under its byte cap, dropping the oldest entries first"""
+    for i, name in enumerate(["old", "idle", "new"]):
+        path = tmp_path / f"{name}.audio"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (i, i))
+    # Reading an entry marks it recently used
+    assert voice_ai_agent._load_tts_file(str(tmp_path / "old.audio")) == b"x" * 100
+
+    voice_ai_agent._evict_tts_files(str(tmp_path), 200)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["new.audio", "old.audio"]
+
+
+def test_google_stt_reuses_gated_samples(monkeypatch):
+    """A clip gated by gate_audio() reaches Google without being decoded again"""
+    agent = VoiceAIAgent.__new__(VoiceAIAgent)
+    agent.stt_provider = 'google'
+    agent._vad = None
+    agent._silence_rms = 0.01
+    sent = []
+
+    async def recognize(pcm, rate):
+        sent.append((pcm, rate))
+        return "hello there"
+
+    monkeypatch.setattr(agent, "_recognize_google", recognize)
+    tone = (0.5 * np.sin(np.linspace(0, 200 * np.pi, 16000))).astype(np.float32)
+    monkeypatch.setattr(agent, "_decode_float32", lambda audio_data: tone)
+
+    async def scenario():
+        gated = await agent.gate_audio(b"clip")
+        monkeypatch.setattr(agent, "_decode_float32", None)
+        monkeypatch.setattr(agent, "_decode_pcm16", None)
+        return await agent._speech_to_text(b"clip", gated=gated)
+
+    assert asyncio.run(scenario()) == "hello there"
+    assert sent == [(voice_ai_agent.f32_to_pcm16(tone).tobytes(), 16000)]
+
+
+def test_silent_gated_clip_skips_stt():
+    """A clip the gate already found silent never reaches an STT backend"""
+    agent = VoiceAIAgent.__new__(VoiceAIAgent)
+    agent.stt_provider = 'google'
+    gated = voice_ai_agent.GatedAudio(np.zeros(16000, dtype=np.float32), True)
+
+    assert asyncio.run(agent._speech_to_text(b"clip", gated=gated)) is None
+
+
+@pytest.mark.parametrize("text, spoken", [
+    # Markdown markers are dropped
+    ("**Hello** there, how are you doing today?", "Hello there, how are you doing today?"),
+    ("`Pipeline` reviews run every *Monday*", "Pipeline reviews run every Monday"),
+    # Headers and boilerplate sentences are skipped for the first real one
+    ("# Sales Strategy Advice.\nYou should call your warmest leads first. Then email.",
+     "You should call your warmest leads first"),
+    ("Your Question: pricing.", "I'm here to help you with that."),
+    # URLs and decimals don't end a sentence
+    ("Check out https://example.com/pricing for the full list of plans.",
+     "Check out https://example.com/pricing for the full list of plans"),
+    ("Conversion rose 3.5 percent this quarter. Nice.", "Conversion rose 3.5 percent this quarter"),
+    # Titles don't end a sentence either
+    ("Dr. Smith will call you back tomorrow morning. Thanks!", "Dr. Smith will call you back tomorrow morning"),
+    ("I spoke with Mr. Jones about the renewal terms.", "I spoke with Mr. Jones about the renewal terms"),
+    # Long replies are cut at a word boundary
+    ("word " * 40, "word " * 18 + "word..."),
+])
+def test_clean_text_for_speech(text, spoken):
+    agent = VoiceAIAgent.__new__(VoiceAIAgent)
+    assert agent._clean_text_for_speech(text) == spoken
+
+
+@pytest.mark.parametrize("text, sentences", [
+    ("Hi there. How are you? Great!", ["Hi there.", "How are you?", "Great!"]),
+    ("Dr. Smith is here. Call Mr. Jones.", ["Dr. Smith is here.", "Call Mr. Jones."]),
+    ("Visit example.com today. Thanks.", ["Visit example.com today.", "Thanks."]),
+    ("Wait...   really?! Yes.", ["Wait...", "really?!", "Yes."]),
+    ("No punctuation", ["No punctuation"]),
+    ("   ", []),
+    ("", []),
+])
+def test_split_sentences(text, sentences):
+    assert voice_ai_agent._split_sentences(text) == sentences
+
+
+def _sentence_agent(monkeypatch):
+    """An agent whose TTS turns each sentence into 100 ms of 16 kHz WAV"""
+    agent = VoiceAIAgent.__new__(VoiceAIAgent)
+    agent.tts_provider = 'pyttsx3'
+    agent.config = {'tts_lookahead': 1}
+
+    async def text_to_speech(sentence):
+        await asyncio.sleep(0)
+        pcm = b"\x01\x00" * 1600
+        return voice_ai_agent._wav_header(len(pcm), 16000) + pcm
+
+    monkeypatch.setattr(agent, "_text_to_speech", text_to_speech)
+    return agent
+
+
+def _pending_tasks():
+    return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+
+def test_pcm_segments_closed_early_stops_producer(monkeypatch):
+    """Closing the stream while the read-ahead queue is full leaves no producer behind"""
+    agent = _sentence_agent(monkeypatch)
+
+    async def scenario():
+        segments = agent._pcm_segments("One. Two. Three. Four.")
+        await anext(segments)
+        await asyncio.sleep(0.01)  # let the producer fill the queue and block
+        await segments.aclose()
+        return _pending_tasks()
+
+    assert asyncio.run(scenario()) == []
+
+
+def test_interrupted_turn_leaves_no_pending_tasks(monkeypatch):
+    """A barge-in mid-reply closes the reply stream and its sentence producer at once"""
+    agent = _sentence_agent(monkeypatch)
+
+    async def process_audio_input(audio_data, synthesize=True, stt_provider=None, gated=None):
+        return {"success": True, "transcription": "hi", "ai_response": {"text": "One. Two. Three. Four."}}
+
+    monkeypatch.setattr(agent, "process_audio_input", process_audio_input)
+
+    async def scenario():
+        barge_in = asyncio.Event()
+        events = []
+        async for event in agent.stream_turn(b"clip", barge_in):
+            events.append(event)
+            if event["type"] == "audio_response":
+                await asyncio.sleep(0.01)
+                barge_in.set()
+        return events, _pending_tasks()
+
+    events, pending = asyncio.run(scenario())
+    assert [event["type"] for event in events] == ["transcript", "audio_response"]
+    assert pending == []
+
+
+def test_tts_permit_held_until_worker_finishes(monkeypatch):
+    """A caller that stops waiting doesn't free the engine while it is still synthesizing"""
+    agent = VoiceAIAgent.__new__(VoiceAIAgent)
+    agent.tts_provider = 'pyttsx3'
+    agent.voice_id = 'alloy'
+    agent._tts_cache = {}
+    agent._tts_cache_dir = None
+    jobs = []
+    agent._tts_workers = types.SimpleNamespace(submit=lambda text, future, loop: jobs.append(future))
+    monkeypatch.setattr(voice_ai_agent, "_have", lambda name: True)
+
+    async def scenario():
+        sem = asyncio.Semaphore(1)
+        monkeypatch.setattr(voice_ai_agent, "_TTS_SEM", sem)
+        call = asyncio.create_task(agent._text_to_speech("Hello there."))
+        await asyncio.sleep(0)
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+        held_after_cancel = sem.locked()
+        # The worker finishes its job some time later
+        voice_ai_agent._resolve_future(jobs[0], None)
+        await asyncio.sleep(0)
+        return held_after_cancel, sem.locked()
+
+    assert asyncio.run(scenario()) == (True, False)
+
+
+def test_tts_disk_cache_sweeps_stale_temp_files(tmp_path):
+    """Temp files left by an interrupted write are removed once stale; fresh ones are left alone"""
+    stale = tmp_path / ("crashed" + voice_ai_agent._TTS_TMP_SUFFIX)
+    fresh = tmp_path / ("writing" + voice_ai_agent._TTS_TMP_SUFFIX)
+    for path in (stale, fresh):
+        path.write_bytes(b"x" * 100)
+    os.utime(stale, (0, 0))
+
+    voice_ai_agent._evict_tts_files(str(tmp_path), 1000)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [fresh.name]
+
+
+def test_persist_tts_removes_temp_file_when_rename_fails(tmp_path, monkeypatch):
+    """A failed write leaves nothing behind in the cache directory"""
+    agent = VoiceAIAgent.__new__(VoiceAIAgent)
+    agent._tts_cache_dir = str(tmp_path)
+    agent._tts_cache_dir_bytes = 1000
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(voice_ai_agent.os, "replace", fail)
+    agent._persist_tts(str(tmp_path / "entry.audio"), b"audio")
+
+    assert list(tmp_path.iterdir()) == []
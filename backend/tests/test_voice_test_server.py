@@ -0,0 +1,103 @@
+"""Tests for the voice test server helpers"""
+import asyncio
+import io
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import HTTPException, UploadFile
+
+import voice_test_server
+from voice_test_server import VoiceConfig
+
+
+def test_agent_config_forwards_agent_settings():
+    """Recognized agent keys and whisper_* pass through; unknown keys and the cache dir don't"""
+    config = VoiceConfig(
+        stt_provider='whisper',
+        whisper_size='base',
+        history_limit=50,
+        silence_rms=0.02,
+        elevenlabs_api_key='key',
+        tts_cache_dir='/tmp/elsewhere',
+        unrelated=True,
+    ).agent_config()
+
+    assert config['stt_provider'] == 'whisper'
+    assert config['whisper_size'] == 'base'
+    assert config['history_limit'] == 50
+    assert config['silence_rms'] == 0.02
+    assert config['elevenlabs_api_key'] == 'key'
+    assert config['tts_cache_dir'] == voice_test_server.TTS_CACHE_DIR
+    assert 'unrelated' not in config
+
+
+@pytest.fixture
+def upload_cap(monkeypatch):
+    monkeypatch.setattr(voice_test_server, "MAX_AUDIO_UPLOAD_BYTES", 10)
+    return 10
+
+
+@pytest.mark.parametrize("size", [10, None])
+def test_read_upload_within_cap(upload_cap, size):
+    upload = UploadFile(io.BytesIO(b"x" * 10), size=size)
+    assert asyncio.run(voice_test_server._read_upload(upload)) == b"x" * 10
+
+
+def test_read_upload_rejects_known_oversize(upload_cap):
+    """A declared size over the cap is refused before anything is read"""
+    data = io.BytesIO(b"x" * 11)
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(voice_test_server._read_upload(UploadFile(data, size=11)))
+    assert excinfo.value.status_code == 413
+    assert data.tell() == 0
+
+
+def test_read_upload_rejects_streamed_oversize(upload_cap):
+    """Without a size, reading stops one byte past the cap"""
+    data = io.BytesIO(b"x" * 1000)
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(voice_test_server._read_upload(UploadFile(data)))
+    assert excinfo.value.status_code == 413
+    assert data.tell() == 11
+
+
+@pytest.fixture
+def audio_store(monkeypatch):
+    """An empty reply store on a controllable clock"""
+    clock = [1000.0]
+    monkeypatch.setattr(voice_test_server, "_audio_responses", {})
+    monkeypatch.setattr(voice_test_server, "_audio_response_bytes", 0)
+    monkeypatch.setattr(voice_test_server, "AUDIO_RESPONSE_TTL", 60.0)
+    monkeypatch.setattr(voice_test_server, "AUDIO_RESPONSE_MAX_BYTES", 250)
+    monkeypatch.setattr(voice_test_server.time, "monotonic", lambda: clock[0])
+    return clock
+
+
+def test_store_audio_response_drops_expired(audio_store):
+    first = voice_test_server._store_audio_response(b"a" * 100)
+    audio_store[0] += 61
+    second = voice_test_server._store_audio_response(b"b" * 100)
+
+    assert list(voice_test_server._audio_responses) == [second]
+    assert first not in voice_test_server._audio_responses
+    assert voice_test_server._audio_response_bytes == 100
+
+
+def test_store_audio_response_evicts_oldest_over_byte_cap(audio_store):
+    ids = [voice_test_server._store_audio_response(bytes([i]) * 100) for i in range(3)]
+
+    assert list(voice_test_server._audio_responses) == ids[1:]
+    assert voice_test_server._audio_response_bytes == 200
+    assert voice_test_server._latest_audio_response() == bytes([2]) * 100
+
+
+def test_store_audio_response_keeps_newest_even_if_oversized(audio_store):
+    voice_test_server._store_audio_response(b"a" * 100)
+    newest = voice_test_server._store_audio_response(b"b" * 500)
+
+    assert list(voice_test_server._audio_responses) == [newest]
+    assert voice_test_server._latest_audio_response() == b"b" * 500
+    audio_store[0] += 61
+    assert voice_test_server._latest_audio_response() is None
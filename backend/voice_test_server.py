@@ -4,76 +4,271 @@ Simple FastAPI server to test voice AI functionality
 Only uses free libraries - no API keys required
 """
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import Depends, FastAPI, UploadFile, File, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, Response, StreamingResponse
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict, Field
+import asyncio
+import base64
+import contextlib
+import importlib.util
+import json
+import logging
 import sys
+import time
+from typing import Dict, Literal, Optional, Tuple
 import os
+import uuid
+
+logger = logging.getLogger(__name__)
 
 # Add the app directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 
+# Global voice agent instance
+voice_agent = None
+voice_agent_config = None  # VoiceConfig the current agent was built from
+voice_agent_startup: Optional[asyncio.Task] = None  # Background import + build of the agent
+
+@lru_cache(maxsize=None)
+def _voice_agent_class():
+    """Import VoiceAIAgent (and its torch/Whisper/pyttsx3 stack) once, on first use (blocking)"""
+    from app.voice.voice_ai_agent import VoiceAIAgent
+    return VoiceAIAgent
+
+async def _wait_for_voice_agent(request: Request):
+    """Hold /voice requests until the background agent start-up has finished"""
+    if voice_agent_startup is not None and request.url.path.startswith("/voice"):
+        await asyncio.shield(voice_agent_startup)
+
 app = FastAPI(
     title="Voice AI Test Server",
     description="Test voice AI with free libraries only",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson encodes the larger /voice bodies (history, debug info) without
+    # holding the event loop for a stdlib json pass
+    default_response_class=ORJSONResponse if importlib.util.find_spec("orjson") else JSONResponse,
+    dependencies=[Depends(_wait_for_voice_agent)]
 )
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    # Explicit origins let browsers cache the preflight (max_age) instead of
+    # re-sending OPTIONS before every credentialed request. Opening
+    # test_voice_client.html straight from disk sends Origin "null"; add it to
+    # CORS_ORIGINS locally rather than trusting every sandboxed or file:// page
+    allow_origins=os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:5173").split(","),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=86400,
 )
 
-# Global voice agent instance
-voice_agent = None
-last_audio_response = None  # Store last generated audio
+# Uploads stay in Starlette's spooled temp file until read; _read_upload rejects
+# anything larger than this without pulling it into memory
+MAX_AUDIO_UPLOAD_BYTES = int(os.getenv("MAX_AUDIO_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+
+# Fixed phrase spoken by /voice/test; synthesized at startup so the smoke
+# test is served from the agent's TTS cache
+TTS_TEST_TEXT = "Hello, this is a test of the voice AI system."
+
+# Synthesized speech is also kept here so canned replies survive restarts
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "tts_cache"))
+# Download name extension for each media type the TTS providers produce
+_AUDIO_EXTENSIONS = {"audio/wav": "wav", "audio/mpeg": "mp3"}
+
+# Synthesized replies are served from /voice/get-audio-response?id=... rather
+# than inlined as base64; each id stays fetchable for this many seconds
+AUDIO_RESPONSE_TTL = float(os.getenv("AUDIO_RESPONSE_TTL", "120"))
+# Older replies are dropped early once the stored WAVs exceed this many bytes
+AUDIO_RESPONSE_MAX_BYTES = int(os.getenv("AUDIO_RESPONSE_MAX_BYTES", str(64 * 1024 * 1024)))
+_audio_responses: Dict[str, Tuple[float, bytes]] = {}  # id -> (expiry, wav), oldest first
+_audio_response_bytes = 0
+
+# Optional VoiceAIAgent settings that VoiceConfig passes through untyped, on
+# top of every whisper_* key (size, backend, CTranslate2 compute type, ...)
+_AGENT_CONFIG_KEYS = frozenset({
+    'language', 'history_limit', 'prompt_history_turns', 'silence_rms',
+    'tts_cache_size', 'tts_cache_dir_bytes', 'tts_lookahead',
+    'elevenlabs_api_key', 'elevenlabs_voice_id', 'google_api_key',
+    'llm_model', 'max_tokens', 'temperature', 'max_batch', 'batch_window_ms',
+    'draft_model', 'num_speculative_tokens', 'disable_speculation_above_batch', 'speculator',
+})
+
+class VoiceConfig(BaseModel):
+    """Voice agent settings, validated once when the request is parsed"""
+    # Extra keys are kept so agent_config() can forward the ones the agent reads
+    model_config = ConfigDict(extra='allow')
+    
+    stt_provider: Literal['faster-whisper', 'whisper', 'google', 'azure'] = 'faster-whisper'
+    tts_provider: Literal['pyttsx3', 'elevenlabs', 'azure'] = 'pyttsx3'
+    ai_model: str = 'local'
+    sample_rate: int = Field(16000, gt=0)
+    chunk_duration: float = Field(1.0, gt=0)
+    voice_id: str = 'alloy'
+    
+    def agent_config(self) -> dict:
+        """Config dict for VoiceAIAgent"""
+        extra = self.model_extra or {}
+        config = self.model_dump(exclude=set(extra))
+        config.update({
+            k: v for k, v in extra.items()
+            if k in _AGENT_CONFIG_KEYS or k.startswith('whisper_')
+        })
+        # Not client-settable: the server owns where cache files are written
+        config['tts_cache_dir'] = TTS_CACHE_DIR
+        return config
+
+if importlib.util.find_spec("orjson"):
+    import orjson
+    
+    def _json_line(obj) -> bytes:
+        """One NDJSON line, encoded by orjson"""
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+else:
+    def _json_line(obj) -> bytes:
+        """One NDJSON line, encoded by the stdlib"""
+        return json.dumps(obj).encode() + b"\n"
+
+async def _ndjson_events(events):
+    """Encode agent turn events as newline-delimited JSON, base64-ing audio frames"""
+    # A client that disconnects mid-reply closes this generator; close the turn with it
+    async with contextlib.aclosing(events):
+        async for event in events:
+            if "audio_data" in event:
+                event = {**event, "audio_data": base64.b64encode(event["audio_data"]).decode("ascii")}
+            yield _json_line(event)
+
+async def _read_upload(upload: UploadFile) -> bytes:
+    """Read an uploaded file, answering 413 instead of buffering more than MAX_AUDIO_UPLOAD_BYTES"""
+    if upload.size is not None:
+        if upload.size > MAX_AUDIO_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="Audio upload is too large")
+        # One exact-size read out of the spooled file
+        return await upload.read()
+    # Size unknown: never read more than one byte past the cap
+    data = await upload.read(MAX_AUDIO_UPLOAD_BYTES + 1)
+    if len(data) > MAX_AUDIO_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Audio upload is too large")
+    return data
+
+def _store_audio_response(audio: bytes) -> str:
+    """Keep a reply's WAV for AUDIO_RESPONSE_TTL seconds and return its id"""
+    global _audio_response_bytes
+    now = time.monotonic()
+    audio_id = uuid.uuid4().hex
+    _audio_responses[audio_id] = (now + AUDIO_RESPONSE_TTL, audio)
+    _audio_response_bytes += len(audio)
+    # Insertion order is expiry order: drop expired replies from the front, then
+    # the oldest live ones while over the byte budget (the newest always stays)
+    while len(_audio_responses) > 1:
+        oldest = next(iter(_audio_responses))
+        expires, old_audio = _audio_responses[oldest]
+        if expires > now and _audio_response_bytes <= AUDIO_RESPONSE_MAX_BYTES:
+            break
+        del _audio_responses[oldest]
+        _audio_response_bytes -= len(old_audio)
+    return audio_id
+
+def _latest_audio_response() -> Optional[bytes]:
+    """The newest stored reply, unless it has expired"""
+    if _audio_responses:
+        expires, audio = _audio_responses[next(reversed(_audio_responses))]
+        if expires > time.monotonic():
+            return audio
+    return None
+
+def _wav_response(audio: bytes, filename: str, extra_headers: Optional[dict] = None) -> Response:
+    """Serve WAV bytes for inline playback"""
+    return Response(
+        content=audio,
+        media_type="audio/wav",
+        headers={
+            "Content-Disposition": f"inline; filename={filename}",
+            "Content-Length": str(len(audio)),
+            **(extra_headers or {})
+        }
+    )
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize voice AI components on startup"""
-    global voice_agent
+    """Start loading the voice AI components in the background"""
+    global voice_agent_startup
+    
+    # / and /health answer right away; /voice requests wait for this task
+    voice_agent_startup = asyncio.create_task(_start_voice_agent())
+
+async def _start_voice_agent():
+    """Import and build the default voice agent off the event loop"""
+    global voice_agent, voice_agent_config
     
     try:
-        from app.voice.voice_ai_agent import VoiceAIAgent
-        
-        config = {
-            'stt_provider': 'whisper',
-            'tts_provider': 'pyttsx3', 
-            'ai_model': 'local',
-            'sample_rate': 16000,
-            'chunk_duration': 1.0,
-            'voice_id': 'alloy'
-        }
+        agent_class = await asyncio.to_thread(_voice_agent_class)
+        
+        config = VoiceConfig()
         
-        voice_agent = VoiceAIAgent(config)
-        print("✅ Voice AI Agent initialized successfully!")
+        voice_agent = await asyncio.to_thread(agent_class, config.agent_config())
+        voice_agent_config = config
+        await voice_agent.warm_up(TTS_TEST_TEXT)
+        logger.info("✅ Voice AI Agent initialized successfully!")
         
     except Exception as e:
-        print(f"⚠️ Voice AI initialization failed: {e}")
+        logger.warning("⚠️ Voice AI initialization failed: %s", e)
         voice_agent = None
 
-@app.get("/")
-async def root():
-    return {
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the voice agent's background workers"""
+    if voice_agent:
+        await voice_agent.aclose()
+
+# / and /health are polled constantly and only vary with whether the agent is
+# up, so both variants of each body are serialized once
+_ROOT_BODIES = {
+    ready: json.dumps({
         "message": "Voice AI Test Server is running!",
         "status": "healthy",
-        "voice_ai_available": voice_agent is not None,
+        "voice_ai_available": ready,
         "features": [
             "Speech-to-Text with OpenAI Whisper (free)",
             "Text-to-Speech with PyTTSx3 (free)",
             "Local AI conversation (no API keys)",
             "Audio file upload and processing"
         ]
-    }
+    }).encode()
+    for ready in (False, True)
+}
+_HEALTH_BODIES = {
+    ready: json.dumps({"status": "healthy", "voice_ai_ready": ready}).encode()
+    for ready in (False, True)
+}
+
+@app.get("/")
+async def root():
+    return Response(content=_ROOT_BODIES[voice_agent is not None], media_type="application/json")
 
 @app.get("/health")
 async def health_check():
-    return {
-        "status": "healthy",
-        "voice_ai_ready": voice_agent is not None
+    return Response(content=_HEALTH_BODIES[voice_agent is not None], media_type="application/json")
+
+@lru_cache(maxsize=1)
+def _capabilities_prefix(agent) -> bytes:
+    """Serialized static part of /voice/capabilities, left open for the history length"""
+    static = {
+        "stt_provider": agent.stt_provider,
+        "tts_provider": agent.tts_provider,
+        "ai_model": agent.ai_model,
+        "sample_rate": agent.sample_rate,
+        "libraries_available": {
+            "faster_whisper": importlib.util.find_spec("faster_whisper") is not None,
+            "whisper": importlib.util.find_spec("whisper") is not None,
+            "pyttsx3": importlib.util.find_spec("pyttsx3") is not None,
+            "speechrecognition": importlib.util.find_spec("speech_recognition") is not None,
+            "av": importlib.util.find_spec("av") is not None
+        }
     }
+    return json.dumps(static)[:-1].encode() + b', "conversation_history_length": '
 
 @app.get("/voice/capabilities")
 async def get_voice_capabilities():
@@ -81,40 +276,32 @@ async def get_voice_capabilities():
     if not voice_agent:
         raise HTTPException(status_code=503, detail="Voice AI not available")
     
-    return {
-        "stt_provider": voice_agent.stt_provider,
-        "tts_provider": voice_agent.tts_provider,
-        "ai_model": voice_agent.ai_model,
-        "sample_rate": voice_agent.sample_rate,
-        "conversation_history_length": len(voice_agent.get_conversation_history()),
-        "libraries_available": {
-            "whisper": True,  # We know these are installed from our test
-            "pyttsx3": True,
-            "speechrecognition": True,
-            "soundfile": True,
-            "librosa": True
-        }
-    }
+    # Only the history length changes between polls; the rest is serialized once per agent
+    body = _capabilities_prefix(voice_agent) + str(voice_agent.conversation_length).encode() + b"}"
+    return Response(content=body, media_type="application/json")
 
 @app.post("/voice/initialize")
-async def initialize_voice_agent(config: dict):
+async def initialize_voice_agent(config: VoiceConfig):
     """Initialize or reconfigure the voice AI agent"""
-    global voice_agent
+    global voice_agent, voice_agent_config
     
     try:
-        from app.voice.voice_ai_agent import VoiceAIAgent
-        
-        # Use provided config or default
-        voice_config = {
-            'stt_provider': config.get('stt_provider', 'whisper'),
-            'tts_provider': config.get('tts_provider', 'pyttsx3'),
-            'ai_model': config.get('ai_model', 'local'),
-            'sample_rate': config.get('sample_rate', 16000),
-            'chunk_duration': config.get('chunk_duration', 1.0),
-            'voice_id': config.get('voice_id', 'alloy')
-        }
+        agent_class = await asyncio.to_thread(_voice_agent_class)
+        
+        voice_config = config.agent_config()
+        
+        # Re-sending the current config keeps the live agent (and its TTS thread)
+        if voice_agent and voice_agent_config == config:
+            return {
+                "success": True,
+                "message": "Voice AI agent already initialized with this config",
+                "config": voice_config
+            }
         
-        voice_agent = VoiceAIAgent(voice_config)
+        if voice_agent:
+            await voice_agent.aclose()
+        voice_agent = await asyncio.to_thread(agent_class, voice_config)
+        voice_agent_config = config
         
         return {
             "success": True,
@@ -132,12 +319,11 @@ async def initialize_voice_agent(config: dict):
 async def process_audio_simple(audio_file: UploadFile = File(...)):
     """Simple audio processing without complex conversion - for testing"""
     try:
-        print(f"📥 Received audio file: {audio_file.filename}")
-        print(f"📊 Content type: {audio_file.content_type}")
+        logger.debug("📥 Received audio file: %s", audio_file.filename)
+        logger.debug("📊 Content type: %s", audio_file.content_type)
         
-        # Read the audio file
-        audio_data = await audio_file.read()
-        print(f"📊 Audio data size: {len(audio_data)} bytes")
+        # The size is known from the spooled upload, so nothing needs to be read
+        logger.debug("📊 Audio data size: %s bytes", audio_file.size)
         
         # For now, just return a success response with basic info
         return {
@@ -150,7 +336,7 @@ async def process_audio_simple(audio_file: UploadFile = File(...)):
             },
             "conversation_length": 1,
             "debug_info": {
-                "audio_size": len(audio_data),
+                "audio_size": audio_file.size,
                 "content_type": audio_file.content_type,
                 "is_fallback": False,
                 "stt_provider": "test"
@@ -158,7 +344,7 @@ async def process_audio_simple(audio_file: UploadFile = File(...)):
         }
         
     except Exception as e:
-        print(f"❌ Simple processing error: {str(e)}")
+        logger.error("❌ Simple processing error: %s", e)
         return {
             "status": "error",
             "error": f"Simple audio processing failed: {str(e)}"
@@ -171,38 +357,58 @@ async def process_audio(audio_file: UploadFile = File(...)):
         raise HTTPException(status_code=503, detail="Voice AI not available")
     
     try:
-        print(f"📥 Received audio file: {audio_file.filename}")
-        print(f"📊 Content type: {audio_file.content_type}")
+        logger.debug("📥 Received audio file: %s", audio_file.filename)
+        logger.debug("📊 Content type: %s", audio_file.content_type)
         
-        # Read the audio file
-        audio_data = await audio_file.read()
-        print(f"📊 Audio data size: {len(audio_data)} bytes")
+        # Check if audio data is valid; the spooled upload's size is known, so
+        # empty recordings are rejected without reading them
+        if audio_file.size is not None and audio_file.size < 100:
+            logger.warning("⚠️ Audio data too small, might be empty")
+            return {
+                "status": "error",
+                "error": "Audio data is too small or empty"
+            }
+        
+        # Read the audio file (bounded by MAX_AUDIO_UPLOAD_BYTES)
+        audio_data = await _read_upload(audio_file)
+        logger.debug("📊 Audio data size: %s bytes", len(audio_data))
         
-        # Check if audio data is valid
         if len(audio_data) < 100:
-            print("⚠️ Audio data too small, might be empty")
+            logger.warning("⚠️ Audio data too small, might be empty")
             return {
                 "status": "error",
                 "error": "Audio data is too small or empty"
             }
         
+        # Near-silent uploads (RMS/VAD gate in the agent) skip STT and the AI reply;
+        # the decoded clip is handed on so STT doesn't decode it a second time
+        gated = await voice_agent.gate_audio(audio_data)
+        if gated.silent:
+            logger.warning("⚠️ Audio is silent, skipping transcription")
+            return {
+                "status": "error",
+                "error": "No speech detected in the audio",
+                "transcription": "",
+                "ai_response": None,
+                "conversation_length": 0,
+                "debug_info": {
+                    "audio_size": len(audio_data),
+                    "content_type": audio_file.content_type,
+                    "silent": True
+                }
+            }
+        
         # For now, skip complex audio processing and use a faster method
         # Let's try Google Speech Recognition first as it's more reliable
-        print("🔄 Switching to Google Speech Recognition for faster processing...")
-        
-        # Temporarily override the STT provider
-        original_provider = voice_agent.stt_provider
-        voice_agent.stt_provider = 'google'
+        logger.debug("🔄 Switching to Google Speech Recognition for faster processing...")
         
         try:
-            # Set a much shorter timeout for faster feedback
-            import asyncio
-            result = await asyncio.wait_for(
-                voice_agent.process_audio_input(audio_data), 
-                timeout=15.0  # 15 second timeout
-            )
+            # Set a much shorter timeout for faster feedback; asyncio.timeout()
+            # bounds the await in place, without wrapping it in a new Task
+            async with asyncio.timeout(15.0):  # 15 second timeout
+                result = await voice_agent.process_audio_input(audio_data, stt_provider='google', gated=gated)
         except asyncio.TimeoutError:
-            print("⏰ Processing timeout - trying fallback")
+            logger.warning("⏰ Processing timeout - trying fallback")
             # Return a quick response to prevent hanging
             return {
                 "status": "success",
@@ -220,17 +426,15 @@ async def process_audio(audio_file: UploadFile = File(...)):
                     "timeout": True
                 }
             }
-        finally:
-            # Restore original provider
-            voice_agent.stt_provider = original_provider
         
-        # Log result without binary audio data
-        result_summary = {k: v for k, v in result.items() if k != 'audio_response'}
-        print(f"✅ Processing result: {result_summary}")
+        # Log result without binary audio data (only built when DEBUG is on)
+        if logger.isEnabledFor(logging.DEBUG):
+            result_summary = {k: v for k, v in result.items() if k != 'audio_response'}
+            logger.debug("✅ Processing result: %s", result_summary)
         
         # Check for error in result
         if "error" in result:
-            print(f"❌ Processing returned error: {result['error']}")
+            logger.error("❌ Processing returned error: %s", result['error'])
             return {
                 "status": "error",
                 "error": result["error"],
@@ -249,7 +453,7 @@ async def process_audio(audio_file: UploadFile = File(...)):
         
         # Additional check: if transcription is empty or None
         if not transcription:
-            print("⚠️ Got empty transcription - STT failed")
+            logger.warning("⚠️ Got empty transcription - STT failed")
             return {
                 "status": "error",
                 "error": "Could not transcribe audio - no speech detected or audio quality too low",
@@ -266,33 +470,26 @@ async def process_audio(audio_file: UploadFile = File(...)):
         is_fallback = transcription == "Hello, I need assistance with my business."
         
         if is_fallback:
-            print("⚠️ Got fallback transcription - STT may have failed")
+            logger.warning("⚠️ Got fallback transcription - STT may have failed")
         
         # Get audio response if available
         audio_response = result.get("audio_response")
         if audio_response:
-            print(f"🔊 Audio response generated: {len(audio_response)} bytes")
-            
-            # Store globally for GET endpoint
-            global last_audio_response
-            last_audio_response = audio_response
+            logger.debug("🔊 Audio response generated: %s bytes", len(audio_response))
             
-            # Convert to base64 for JSON response
-            import base64
-            print("🔄 Encoding audio to base64...")
-            audio_response_b64 = base64.b64encode(audio_response).decode('utf-8')
-            print(f"✅ Base64 encoded: {len(audio_response_b64)} characters")
+            # Store for the GET endpoint; the JSON only carries its URL
+            audio_response_url = f"/voice/get-audio-response?id={_store_audio_response(audio_response)}"
         else:
-            print("⚠️ No audio response generated")
-            audio_response_b64 = None
+            logger.warning("⚠️ No audio response generated")
+            audio_response_url = None
         
-        print("📤 Preparing response...")
+        logger.debug("📤 Preparing response...")
         response_data = {
             "status": "success",
             "transcription": transcription,
             "ai_response": result.get("ai_response"),
-            "audio_response": audio_response_b64,  # Include audio response
-            "conversation_length": len(voice_agent.get_conversation_history()),
+            "audio_response_url": audio_response_url,  # WAV served by /voice/get-audio-response
+            "conversation_length": voice_agent.conversation_length,
             "debug_info": {
                 "audio_size": len(audio_data),
                 "content_type": audio_file.content_type,
@@ -302,13 +499,13 @@ async def process_audio(audio_file: UploadFile = File(...)):
                 "audio_response_size": len(audio_response) if audio_response else 0
             }
         }
-        print("✅ Returning response")
+        logger.debug("✅ Returning response")
         return response_data
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Processing error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Processing error: %s", e)
         
         # Return a user-friendly error instead of crashing
         return {
@@ -322,68 +519,81 @@ async def process_audio(audio_file: UploadFile = File(...)):
             }
         }
 
+@app.post("/voice/process-audio/stream")
+async def process_audio_stream(audio_file: UploadFile = File(...)):
+    """Process an audio file, streaming the transcript and then reply audio as NDJSON.
+
+    Reply PCM is synthesized sentence by sentence while earlier frames are
+    already on the wire, so playback starts before the whole reply is spoken.
+    """
+    if not voice_agent:
+        raise HTTPException(status_code=503, detail="Voice AI not available")
+    
+    audio_data = await _read_upload(audio_file)
+    if len(audio_data) < 100:
+        raise HTTPException(status_code=400, detail="Audio data is too small or empty")
+    gated = await voice_agent.gate_audio(audio_data)
+    if gated.silent:
+        raise HTTPException(status_code=422, detail="No speech detected in the audio")
+    
+    return StreamingResponse(
+        _ndjson_events(voice_agent.stream_turn(audio_data, stt_provider='google', gated=gated)),
+        media_type="application/x-ndjson"
+    )
+
 @app.post("/voice/text-to-speech")
 async def text_to_speech(request: dict):
     """Convert text to speech and return audio file"""
-    print(f"🎤 Received TTS request: {request}")
+    logger.debug("🎤 Received TTS request: %s", request)
     
     # Check if we have a cached audio response from recent request
-    global last_audio_response
+    last_audio_response = _latest_audio_response()
     if last_audio_response:
-        print(f"✅ Using cached audio response: {len(last_audio_response)} bytes")
-        from fastapi.responses import Response
-        return Response(
-            content=last_audio_response,
-            media_type="audio/wav",
-            headers={
-                "Content-Disposition": "inline; filename=response.wav",
-                "Content-Length": str(len(last_audio_response)),
-                "Access-Control-Allow-Origin": "*"
-            }
-        )
+        logger.debug("✅ Using cached audio response: %s bytes", len(last_audio_response))
+        return _wav_response(last_audio_response, "response.wav")
     
     if not voice_agent:
-        print("❌ Voice agent not available")
+        logger.error("❌ Voice agent not available")
         raise HTTPException(status_code=503, detail="Voice AI not available")
     
     text = request.get("text", "")
     if not text:
-        print("❌ No text provided")
+        logger.error("❌ No text provided")
         raise HTTPException(status_code=400, detail="Text is required")
     
+    # Text already synthesized to the disk cache is streamed from the file
+    # instead of being loaded into a bytes body
+    cached_file = voice_agent.tts_cache_file(text)
+    if cached_file:
+        logger.debug("✅ Serving cached TTS file: %s", cached_file)
+        return FileResponse(
+            cached_file,
+            media_type=voice_agent.speech_media_type,
+            filename=f"response.{_AUDIO_EXTENSIONS.get(voice_agent.speech_media_type, 'wav')}",
+            content_disposition_type="inline"
+        )
+    
     try:
-        print(f"🔊 TTS request for: '{text[:50]}...'")
+        logger.debug("🔊 TTS request for: '%s...'", text[:50])
         
         # Try to generate audio with timeout
-        import asyncio
         audio_data = None
         
         try:
-            audio_data = await asyncio.wait_for(
-                voice_agent._text_to_speech(text),
-                timeout=5.0  # 5 second timeout
-            )
+            async with asyncio.timeout(5.0):  # 5 second timeout
+                audio_data = await voice_agent._text_to_speech(text)
         except asyncio.TimeoutError:
-            print("⚠️ TTS timed out, returning text-only response")
+            logger.warning("⚠️ TTS timed out, returning text-only response")
         except Exception as tts_error:
-            print(f"⚠️ TTS generation error: {tts_error}")
+            logger.warning("⚠️ TTS generation error: %s", tts_error)
         
         # If we have audio, return it
         if audio_data and len(audio_data) > 0:
-            print(f"✅ Generated {len(audio_data)} bytes of audio")
-            from fastapi.responses import Response
-            return Response(
-                content=audio_data,
-                media_type="audio/wav",
-                headers={
-                    "Content-Disposition": "inline; filename=response.wav",
-                    "Content-Length": str(len(audio_data)),
-                    "Access-Control-Allow-Origin": "*"
-                }
-            )
+            logger.debug("✅ Generated %s bytes of audio", len(audio_data))
+            return _wav_response(audio_data, "response.wav")
         else:
             # Return a JSON response indicating no audio available
-            print("⚠️ No audio generated, returning text-only")
+            logger.warning("⚠️ No audio generated, returning text-only")
             return {
                 "status": "text_only",
                 "message": "TTS not available",
@@ -391,9 +601,7 @@ async def text_to_speech(request: dict):
             }
             
     except Exception as e:
-        print(f"❌ TTS endpoint error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ TTS endpoint error: %s", e)
         # Return text-only response instead of error
         return {
             "status": "error",
@@ -402,6 +610,21 @@ async def text_to_speech(request: dict):
             "error": str(e)
         }
 
+@app.post("/voice/text-to-speech/stream")
+async def text_to_speech_stream(request: dict):
+    """Stream synthesized speech so playback can start before synthesis ends"""
+    if not voice_agent:
+        raise HTTPException(status_code=503, detail="Voice AI not available")
+    
+    text = request.get("text", "")
+    if not text:
+        raise HTTPException(status_code=400, detail="Text is required")
+    
+    return StreamingResponse(
+        voice_agent.stream_speech(text),
+        media_type=voice_agent.speech_media_type
+    )
+
 @app.post("/voice/simple-test")
 async def simple_voice_test():
     """Simple voice test without any complex processing"""
@@ -419,7 +642,7 @@ async def simple_voice_test():
             "status": "success",
             "transcription": test_text,
             "ai_response": ai_response,
-            "conversation_length": len(voice_agent.get_conversation_history()),
+            "conversation_length": voice_agent.conversation_length,
             "note": "This is a simple test - no audio processing involved"
         }
     except Exception as e:
@@ -429,23 +652,20 @@ async def simple_voice_test():
         }
 
 @app.get("/voice/get-audio-response")
-async def get_audio_response():
-    """Get the last generated audio response as a WAV file"""
-    global last_audio_response
+async def get_audio_response(id: Optional[str] = None):
+    """Get a generated audio response (by id, or the last one) as a WAV file"""
+    if id is not None:
+        entry = _audio_responses.get(id)
+        if entry is None or entry[0] <= time.monotonic():
+            raise HTTPException(status_code=404, detail="Audio response expired or not found")
+        # Each id names one immutable reply, so the browser may cache it
+        return _wav_response(entry[1], "ai_response.wav", {"Cache-Control": f"private, max-age={int(AUDIO_RESPONSE_TTL)}"})
     
+    last_audio_response = _latest_audio_response()
     if not last_audio_response:
         raise HTTPException(status_code=404, detail="No audio response available")
     
-    from fastapi.responses import Response
-    return Response(
-        content=last_audio_response,
-        media_type="audio/wav",
-        headers={
-            "Content-Disposition": "inline; filename=ai_response.wav",
-            "Content-Length": str(len(last_audio_response)),
-            "Cache-Control": "no-cache"
-        }
-    )
+    return _wav_response(last_audio_response, "ai_response.wav", {"Cache-Control": "no-cache"})
 
 @app.post("/voice/test-audio")
 async def test_audio_processing():
@@ -463,7 +683,7 @@ async def test_audio_processing():
             "transcription": sample_text,
             "ai_response": ai_response.get('text', 'Test response from AI'),
             "audio_response": None,
-            "conversation_length": len(voice_agent.get_conversation_history())
+            "conversation_length": voice_agent.conversation_length
         }
         
     except Exception as e:
@@ -480,7 +700,7 @@ async def test_voice_system():
     
     try:
         # Test TTS
-        await voice_agent._text_to_speech("Hello, this is a test of the voice AI system.")
+        await voice_agent._text_to_speech(TTS_TEST_TEXT)
         
         return {
             "status": "success",
@@ -496,6 +716,14 @@ async def test_voice_system():
             "message": f"Voice AI test failed: {str(e)}"
         }
 
+@app.get("/voice/history")
+async def get_history():
+    """Get the conversation history as timestamp/user/ai columns"""
+    if not voice_agent:
+        raise HTTPException(status_code=503, detail="Voice AI not available")
+    
+    return Response(content=voice_agent.history_json(), media_type="application/json")
+
 @app.post("/voice/clear-conversation")
 async def clear_conversation():
     """Clear the conversation history"""
@@ -516,4 +744,13 @@ async def clear_conversation():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
+    # Request tracing is at DEBUG; set LOG_LEVEL=DEBUG to see it
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING").upper())
+    # Each worker builds its own agent (and Whisper model) in startup_event, so
+    # conversation history, /voice/initialize and the stored reply audio are per
+    # worker: an audio_response_url fetched through another worker 404s. Keep the
+    # default of one unless requests are pinned to a worker
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run(app if workers == 1 else "voice_test_server:app", host="0.0.0.0", port=8001,
+                loop="asyncio" if sys.platform == "win32" else "uvloop", http="httptools",
+                workers=workers)
\ No newline at end of file
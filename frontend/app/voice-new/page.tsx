@@ -19,6 +19,7 @@ interface VoiceResponse {
     confidence: number;
   };
   audio_response?: string;
+  audio_response_url?: string;
   note?: string;
   error?: string;
 }
@@ -478,31 +479,24 @@ export default function VoicePage() {
     }
   };
 
-  const playAudioFromBase64 = async (base64Audio: string) => {
+  const playAudioFromUrl = async (audioPath: string) => {
     try {
       if (!audioRef.current) {
         console.error('❌ Audio element not found!');
         return;
       }
 
-      console.log('🔓 Decoding base64 audio...');
+      console.log('🔗 Streaming audio from', audioPath);
       
       // Set AI speaking flag IMMEDIATELY to prevent recording AI's voice
       isAISpeakingRef.current = true;
       setIsAISpeaking(true);
       
-      const audioData = atob(base64Audio);
-      const arrayBuffer = new ArrayBuffer(audioData.length);
-      const uint8Array = new Uint8Array(arrayBuffer);
-      
-      for (let i = 0; i < audioData.length; i++) {
-        uint8Array[i] = audioData.charCodeAt(i);
-      }
-      
-      const audioBlob = new Blob([uint8Array], { type: 'audio/wav' });
-      console.log('🎵 Decoded audio blob size:', audioBlob.size, 'bytes');
-      const audioUrl = URL.createObjectURL(audioBlob);
+      // The audio element fetches and decodes the WAV itself
+      const audioUrl = `http://localhost:8001${audioPath}`;
       
+      // CORS-mode fetch so the visualizer's MediaElementSource can read the samples
+      audioRef.current.crossOrigin = 'anonymous';
       audioRef.current.src = audioUrl;
       console.log('🎯 Audio source set, attempting playback...');
       
@@ -547,7 +541,7 @@ export default function VoicePage() {
           });
       });
     } catch (error) {
-      console.error('❌ Error playing audio from base64:', error);
+      console.error('❌ Error playing audio from URL:', error);
       isAISpeakingRef.current = false;
       setIsAISpeaking(false);
       throw error;
@@ -597,14 +591,14 @@ export default function VoicePage() {
           timestamp: new Date().toLocaleTimeString(),
           user_input: data.transcription || '🎤 Voice input',
           ai_response: typeof data.ai_response === 'object' ? data.ai_response.text : data.ai_response || '',
-          has_audio: !!data.audio_response
+          has_audio: !!data.audio_response_url
         };
         setConversationHistory(prev => [...prev, newEntry]);
 
-        // Play audio response if available (already in the response as base64)
-        if (data.audio_response) {
+        // Play audio response if available (served as WAV from audio_response_url)
+        if (data.audio_response_url) {
           console.log('🔊 Playing AI audio response...');
-          await playAudioFromBase64(data.audio_response);
+          await playAudioFromUrl(data.audio_response_url);
           console.log('✅ AI finished speaking - listening for next question...');
         } else {
           console.log('⚠️ No audio response in server reply - generating TTS for text');
@@ -886,7 +880,7 @@ export default function VoicePage() {
           timestamp: new Date().toLocaleTimeString(),
           user_input: data.transcription || `📁 ${file.name}`,
           ai_response: typeof data.ai_response === 'object' ? data.ai_response.text : data.ai_response || '',
-          has_audio: !!data.audio_response
+          has_audio: !!data.audio_response_url
         };
         setConversationHistory(prev => [...prev, newEntry]);
 
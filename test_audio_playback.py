@@ -36,15 +36,22 @@ async def test_tts_generation():
         
         # Try to play it
         try:
-            import subprocess
             import platform
             
             system = platform.system()
             print(f"\n🔊 Attempting to play audio on {system}...")
             
             if system == "Windows":
-                # Use Windows Media Player
-                subprocess.run(["powershell", "-c", f"(New-Object Media.SoundPlayer '{output_file}').PlaySync()"], check=True)
+                # PlaySync keeps PowerShell alive until playback ends; awaiting the
+                # process leaves the event loop free meanwhile. The path goes in
+                # through the environment so it is never parsed as PowerShell
+                proc = await asyncio.create_subprocess_exec(
+                    "powershell", "-NoProfile", "-c",
+                    "(New-Object Media.SoundPlayer $env:TEST_WAV_PATH).PlaySync()",
+                    env={**os.environ, "TEST_WAV_PATH": os.path.abspath(output_file)}
+                )
+                if await proc.wait() != 0:
+                    raise RuntimeError(f"powershell exited with code {proc.returncode}")
             
             print("✅ Audio playback completed!")
             
@@ -1,6 +1,7 @@
+import asyncio
 from temporalio import workflow, activity
 from datetime import timedelta
-from typing import Dict, Any
+from typing import Dict, Any, List
 from loguru import logger
 
 
@@ -12,6 +13,14 @@ async def send_email_activity(email_data: Dict[str, Any]) -> Dict[str, Any]:
     return {"status": "sent", "email_id": "email_123"}
 
 
+@activity.defn
+async def send_emails_batch_activity(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Activity to send a batch of emails over one connection"""
+    logger.info(f"Sending {len(batch)} emails")
+    # Pipelined email sending logic here
+    return [{"status": "sent", "email_id": f"email_{i}"} for i, _ in enumerate(batch)]
+
+
 @activity.defn
 async def make_sales_call_activity(call_data: Dict[str, Any]) -> Dict[str, Any]:
     """Activity to initiate sales call"""
@@ -28,6 +37,38 @@ async def analyze_interaction_activity(interaction_data: Dict[str, Any]) -> Dict
     return {"insights": "Customer interested in product", "next_action": "follow_up"}
 
 
+@activity.defn
+async def analyze_interactions_batch_activity(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Activity to analyze a batch of interactions in one pass"""
+    logger.info(f"Analyzing {len(batch)} interactions for learning")
+    # Batched analysis logic here (one similarity search for the whole batch)
+    return [{"insights": "Customer interested in product", "next_action": "follow_up"} for _ in batch]
+
+
+# Emails per send_emails_batch_activity call; one activity round-trip covers a whole chunk
+EMAIL_BATCH_SIZE = 100
+
+
+def _personalize(email_data: Dict[str, Any], recipients: List[str]) -> List[Dict[str, Any]]:
+    """One email per recipient, or just email_data when there is no recipient list"""
+    if not recipients:
+        return [email_data]
+    return [{**(email_data or {}), "recipient": recipient} for recipient in recipients]
+
+
+async def _send_emails(emails: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Send emails from a workflow, EMAIL_BATCH_SIZE per activity, all chunks in flight at once"""
+    chunks = await asyncio.gather(*(
+        workflow.start_activity(
+            send_emails_batch_activity,
+            emails[start:start + EMAIL_BATCH_SIZE],
+            start_to_close_timeout=timedelta(minutes=5)
+        )
+        for start in range(0, len(emails), EMAIL_BATCH_SIZE)
+    ))
+    return [result for chunk in chunks for result in chunk]
+
+
 @workflow.defn
 class OutboundCampaignWorkflow:
     """Workflow for automated outbound campaigns"""
@@ -36,6 +77,54 @@ class OutboundCampaignWorkflow:
     async def run(self, campaign_data: Dict[str, Any]) -> Dict[str, Any]:
         """Execute outbound campaign workflow"""
         
+        if not workflow.patched("batch-email-activities"):
+            # Histories recorded before the batch activities replay the original commands
+            return await self._run_single(campaign_data)
+        
+        recipients = campaign_data.get("recipients")
+        
+        # Send initial emails
+        email_results = await _send_emails(_personalize(campaign_data.get("email_data"), recipients))
+        
+        # Wait for response or timeout
+        await workflow.sleep(timedelta(hours=24))
+        
+        # If no response, schedule follow-up
+        followup_results = await _send_emails(_personalize(campaign_data.get("followup_data"), recipients))
+        
+        # Analyze campaign performance, one batch for every recipient
+        analyses = await workflow.execute_activity(
+            analyze_interactions_batch_activity,
+            [
+                {"email_result": email_result, "followup_result": followup_result}
+                for email_result, followup_result in zip(email_results, followup_results)
+            ],
+            start_to_close_timeout=timedelta(minutes=10)
+        )
+        
+        # Same keys as before; recipient campaigns add the per-recipient breakdown
+        result = {
+            "campaign_id": campaign_data.get("campaign_id"),
+            "email_result": email_results[0],
+            "followup_result": followup_results[0],
+            "analysis": analyses[0]
+        }
+        if recipients:
+            result["recipient_results"] = [
+                {
+                    "recipient": recipient,
+                    "email_result": email_result,
+                    "followup_result": followup_result,
+                    "analysis": analysis
+                }
+                for recipient, email_result, followup_result, analysis
+                in zip(recipients, email_results, followup_results, analyses)
+            ]
+        return result
+    
+    async def _run_single(self, campaign_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Original one-email-per-activity campaign, kept for workflows started before batching"""
+        
         # Send initial email
         email_result = await workflow.execute_activity(
             send_email_activity,
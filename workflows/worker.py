@@ -7,8 +7,10 @@ from workflows.temporal_workflows import (
     SalesCallWorkflow,
     ContinuousLearningWorkflow,
     send_email_activity,
+    send_emails_batch_activity,
     make_sales_call_activity,
-    analyze_interaction_activity
+    analyze_interaction_activity,
+    analyze_interactions_batch_activity
 )
 from app.core.config import settings
 
@@ -30,9 +32,15 @@ async def main():
         ],
         activities=[
             send_email_activity,
+            send_emails_batch_activity,
             make_sales_call_activity,
-            analyze_interaction_activity
-        ]
+            analyze_interaction_activity,
+            analyze_interactions_batch_activity
+        ],
+        # Campaign fan-out starts many batch activities at once; the SDK
+        # defaults would queue most of them behind each other
+        max_concurrent_activities=64,
+        max_concurrent_workflow_tasks=32
     )
     
     print("Starting Temporal worker...")